@@ -1,6 +1,8 @@
 # FastApi + MongoDb + Selenium + BeautifulSoup + polars for css analitics
 
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException, Query, Request
+from app.responses import polars_response
+from app.services.person_index import get_person_timeline
 # from app.db import db
 # from app.selenium_worker import submit_task
 
@@ -14,6 +16,36 @@ async def root():
         }
 
 
+@app.get("/personas/{cedula}/historial")
+def person_history(request: Request, cedula: str, orient: str = Query("rows", pattern="^(rows|columns)$")):
+    timeline = get_person_timeline(cedula=cedula)
+    if timeline.is_empty():
+        raise HTTPException(status_code=404, detail="Cédula no encontrada en el índice")
+
+    return polars_response(
+        timeline,
+        request,
+        orient=orient,
+        envelope={"cedula": cedula, "registros": timeline.height},
+        key="historial"
+        )
+
+
+@app.get("/posiciones/{posicion}/historial")
+def position_history(request: Request, posicion: str, orient: str = Query("rows", pattern="^(rows|columns)$")):
+    timeline = get_person_timeline(posicion=posicion)
+    if timeline.is_empty():
+        raise HTTPException(status_code=404, detail="Posición no encontrada en el índice")
+
+    return polars_response(
+        timeline,
+        request,
+        orient=orient,
+        envelope={"posicion": posicion, "registros": timeline.height},
+        key="historial"
+        )
+
+
 
 
 
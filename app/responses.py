@@ -0,0 +1,205 @@
+# ------------------------------------ LIBRERIAS ------------------
+import polars as pl
+import orjson
+import zlib
+from fastapi import Request
+from fastapi.responses import Response, StreamingResponse
+
+# Brotli es opcional: si no está instalado solo se negocia gzip
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# ------------------------------------ CONFIGURACIÓN ------------------
+
+# Filas por chunk al serializar y al hacer streaming
+CHUNK_SIZE = 5000
+
+# A partir de cuántas filas se responde en streaming
+STREAMING_THRESHOLD = 20000
+
+# Tamaño mínimo (bytes) para comprimir una respuesta completa
+MINIMUM_COMPRESS_SIZE = 500
+
+# ------------------------------------ FUNCIONES ------------------
+
+def negotiate_encoding(accept_encoding: str) -> str:
+    """
+    Elige la codificación de contenido a partir del header Accept-Encoding
+
+    Args:
+        accept_encoding: Valor del header Accept-Encoding
+
+    Returns:
+        'br', 'gzip' o '' si no se debe comprimir
+    """
+    accepted = {}
+    for item in (accept_encoding or "").split(","):
+        parts = item.strip().split(";")
+        coding = parts[0].strip().lower()
+        if not coding:
+            continue
+
+        quality = 1.0
+        for param in parts[1:]:
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[coding] = quality
+
+    # Codificaciones soportadas en orden de preferencia para desempatar
+    supported = ["br", "gzip"] if brotli is not None else ["gzip"]
+    wildcard = accepted.get("*", 0.0)
+
+    best, best_quality = "", 0.0
+    for coding in supported:
+        quality = accepted.get(coding, wildcard)
+        if quality > best_quality:
+            best, best_quality = coding, quality
+
+    return best
+
+
+def _compressor(encoding: str):
+    """Devuelve un compresor incremental con métodos compress/flush"""
+    if encoding == "br":
+        compressor = brotli.Compressor(quality=4)
+        return compressor.process, compressor.finish
+    if encoding == "gzip":
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+        return compressor.compress, compressor.flush
+
+    return None
+
+
+def _column_json(df: pl.DataFrame, column: str) -> bytes:
+    """
+    Serializa los valores de una columna con el writer nativo de Polars
+
+    Devuelve solo los valores separados por comas (sin corchetes), con el mismo
+    formato que usa write_json para las filas.
+    """
+    # write_json genera '[{"v":[...]}]'; se quita el envoltorio
+    data = df.select(pl.col(column).implode().alias("v")).write_json().encode()
+    return data[len(b'[{"v":['):-len(b']}]')]
+
+
+def iter_json_chunks(df: pl.DataFrame, orient: str = "rows", envelope: dict = None,
+                     key: str = "data", chunk_size: int = CHUNK_SIZE):
+    """
+    Serializa un DataFrame de Polars a JSON por partes, sin construir dicts por fila
+
+    Args:
+        df: DataFrame de Polars
+        orient: 'rows' (lista de objetos) o 'columns' (objeto de listas)
+        envelope: Campos adicionales del objeto JSON que contiene los datos (opcional)
+        key: Llave bajo la cual van los datos si se usa envelope
+        chunk_size: Número de filas por chunk
+
+    Yields:
+        Fragmentos de bytes que concatenados forman un JSON válido
+    """
+    if orient not in ("rows", "columns"):
+        raise ValueError(f"Orientación no soportada: {orient}")
+
+    if envelope is not None:
+        prefix = orjson.dumps(envelope)[:-1]
+        if len(prefix) > 1:
+            prefix += b","
+        yield prefix + orjson.dumps(key) + b":"
+
+    if orient == "rows":
+        # El writer nativo de Polars genera '[{...},{...}]' por chunk
+        yield b"["
+        for offset in range(0, df.height, chunk_size):
+            chunk = df.slice(offset, chunk_size).write_json().encode()
+            yield (b"," if offset else b"") + chunk[1:-1]
+        yield b"]"
+    else:
+        yield b"{"
+        for i, column in enumerate(df.columns):
+            yield (b"," if i else b"") + orjson.dumps(column) + b":["
+            for offset in range(0, df.height, chunk_size):
+                chunk = _column_json(df.slice(offset, chunk_size), column)
+                yield (b"," if offset else b"") + chunk
+            yield b"]"
+        yield b"}"
+
+    if envelope is not None:
+        yield b"}"
+
+
+def polars_json_bytes(df: pl.DataFrame, orient: str = "rows", envelope: dict = None,
+                      key: str = "data") -> bytes:
+    """
+    Serializa un DataFrame de Polars a bytes JSON
+
+    Args:
+        df: DataFrame de Polars
+        orient: 'rows' (lista de objetos) o 'columns' (objeto de listas)
+        envelope: Campos adicionales del objeto JSON que contiene los datos (opcional)
+        key: Llave bajo la cual van los datos si se usa envelope
+
+    Returns:
+        JSON en bytes (UTF-8)
+    """
+    return b"".join(iter_json_chunks(df, orient, envelope, key))
+
+
+def polars_response(df: pl.DataFrame, request: Request = None, orient: str = "rows",
+                    envelope: dict = None, key: str = "data", status_code: int = 200) -> Response:
+    """
+    Construye la respuesta JSON de un DataFrame saltándose el encoder de FastAPI
+
+    Los DataFrames grandes se envían en streaming por chunks. Si el cliente lo
+    acepta (Accept-Encoding), la respuesta se comprime con brotli o gzip.
+
+    Args:
+        df: DataFrame de Polars
+        request: Request de FastAPI, usado para negociar la compresión (opcional)
+        orient: 'rows' (lista de objetos) o 'columns' (objeto de listas)
+        envelope: Campos adicionales del objeto JSON que contiene los datos (opcional)
+        key: Llave bajo la cual van los datos si se usa envelope
+        status_code: Código HTTP de la respuesta
+
+    Returns:
+        Response o StreamingResponse con media type application/json
+    """
+    encoding = negotiate_encoding(request.headers.get("accept-encoding", "")) if request else ""
+    headers = {"Vary": "Accept-Encoding"}
+
+    if df.height > STREAMING_THRESHOLD:
+        chunks = iter_json_chunks(df, orient, envelope, key)
+        compressor = _compressor(encoding)
+
+        if compressor:
+            compress, flush = compressor
+            headers["Content-Encoding"] = encoding
+
+            def compressed_chunks():
+                for chunk in chunks:
+                    data = compress(chunk)
+                    if data:
+                        yield data
+                yield flush()
+
+            body = compressed_chunks()
+        else:
+            body = chunks
+
+        return StreamingResponse(body, status_code=status_code,
+                                 media_type="application/json", headers=headers)
+
+    content = polars_json_bytes(df, orient, envelope, key)
+
+    if encoding and len(content) >= MINIMUM_COMPRESS_SIZE:
+        compress, flush = _compressor(encoding)
+        content = compress(content) + flush()
+        headers["Content-Encoding"] = encoding
+
+    return Response(content, status_code=status_code,
+                    media_type="application/json", headers=headers)
@@ -0,0 +1,375 @@
+# ------------------------------------ LIBRERIAS ------------------
+import polars as pl
+import sqlite3
+import os
+import re
+import sys
+import logging
+from contextlib import closing
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+# ------------------------------------ CONFIGURACIÓN ------------------
+
+# Base SQLite donde se persiste el índice de personas entre snapshots.
+# Se consulta en cada búsqueda (sin caché en memoria), así el API ve los
+# snapshots que guarde el proceso del scraper.
+INDEX_FILE = os.getenv(
+    "PERSON_INDEX_FILE",
+    os.path.join(os.path.dirname(__file__), "data", "person_index.sqlite")
+)
+
+CEDULA_COLUMN = "Cédula"
+POSICION_COLUMN = "Identificacion / Posicion"
+
+# Versión del esquema; si cambia, el índice debe reconstruirse
+SCHEMA_VERSION = 2
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    path TEXT PRIMARY KEY,
+    snapshot_date TEXT NOT NULL,
+    indexed_at TEXT NOT NULL,
+    rows INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS locations (
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL,
+    snapshot TEXT NOT NULL,
+    row INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_locations_key ON locations (kind, key);
+CREATE INDEX IF NOT EXISTS idx_locations_snapshot ON locations (snapshot);
+"""
+
+# Fecha al final del nombre del snapshot: employees_data_all_pages_YYYYMMDD.parquet
+SNAPSHOT_DATE_PATTERN = re.compile(r"_(\d{8})$")
+
+# ------------------------------------ FUNCIONES ------------------
+
+def normalize_cedula(cedula) -> str:
+    """
+    Normaliza una cédula para usarla como llave del índice
+
+    Quita espacios, pasa a mayúsculas y elimina ceros a la izquierda de cada
+    segmento numérico, de modo que "1-0721-02263" y "1-721-2263" coinciden.
+
+    Args:
+        cedula: Cédula tal como aparece en la planilla
+
+    Returns:
+        Cédula normalizada ('' si no es válida)
+    """
+    if cedula is None:
+        return ""
+
+    text = re.sub(r"\s+", "", str(cedula)).upper()
+    parts = []
+    for part in text.split("-"):
+        if part.isdigit():
+            part = part.lstrip("0") or "0"
+        parts.append(part)
+
+    return "-".join(parts)
+
+
+def normalize_posicion(posicion) -> str:
+    """
+    Normaliza un número de posición para usarlo como llave del índice
+
+    Args:
+        posicion: Identificacion / Posicion (entero o texto)
+
+    Returns:
+        Posición normalizada ('' si no es válida)
+    """
+    if posicion is None:
+        return ""
+
+    text = re.sub(r"\s+", "", str(posicion))
+    if text.endswith(".0"):
+        text = text[:-2]
+
+    return text.lstrip("0") or ("0" if text else "")
+
+
+def _connect(index_file: str = None) -> sqlite3.Connection:
+    """
+    Abre el índice (creando las tablas si no existen)
+
+    Si el archivo está corrupto o tiene otro esquema se lanza
+    sqlite3.DatabaseError en lugar de sobrescribirlo; se debe reconstruir con
+    rebuild_person_index.
+    """
+    index_file = index_file or INDEX_FILE
+    os.makedirs(os.path.dirname(index_file) or ".", exist_ok=True)
+    conn = sqlite3.connect(index_file, timeout=30)
+
+    try:
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        has_tables = conn.execute(
+            "SELECT COUNT(*) FROM sqlite_master WHERE type = 'table'"
+        ).fetchone()[0]
+
+        if has_tables and version != SCHEMA_VERSION:
+            raise sqlite3.DatabaseError(
+                f"esquema versión {version}, se esperaba {SCHEMA_VERSION}"
+            )
+
+        if not has_tables:
+            conn.executescript(SCHEMA)
+            conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    except sqlite3.DatabaseError as e:
+        conn.close()
+        logger.error(f"Índice de personas inválido ({index_file}), ejecute rebuild_person_index: {e}")
+        raise
+
+    return conn
+
+
+def snapshot_date_from_file(parquet_file: str) -> datetime:
+    """
+    Deduce la fecha de un snapshot a partir de su archivo
+
+    Usa el sufijo _YYYYMMDD del nombre si existe; si no, la fecha de
+    modificación del archivo.
+
+    Args:
+        parquet_file: Ruta al archivo Parquet del snapshot
+
+    Returns:
+        Fecha del snapshot
+    """
+    stem = os.path.splitext(os.path.basename(parquet_file))[0]
+    match = SNAPSHOT_DATE_PATTERN.search(stem)
+
+    if match:
+        try:
+            return datetime.strptime(match.group(1), "%Y%m%d")
+        except ValueError:
+            pass
+
+    return datetime.fromtimestamp(os.path.getmtime(parquet_file))
+
+
+def _index_snapshot(conn: sqlite3.Connection, parquet_file: str, df: pl.DataFrame = None,
+                    snapshot_date: datetime = None):
+    """Reemplaza dentro de una transacción las entradas de un snapshot"""
+    # Tamaño y fecha de modificación del archivo que se indexa, para detectar
+    # si luego se sobrescribe sin actualizar el índice
+    stat = os.stat(parquet_file)
+    snapshot_date = snapshot_date or snapshot_date_from_file(parquet_file)
+
+    if df is None:
+        df = pl.read_parquet(parquet_file, columns=[
+            c for c in (CEDULA_COLUMN, POSICION_COLUMN)
+            if c in pl.read_parquet_schema(parquet_file)
+        ])
+
+    snapshot = os.path.abspath(parquet_file)
+    locations = []
+
+    for column, kind, normalize in (
+        (CEDULA_COLUMN, "cedula", normalize_cedula),
+        (POSICION_COLUMN, "posicion", normalize_posicion),
+    ):
+        if column not in df.columns:
+            logger.warning(f"El snapshot {parquet_file} no tiene la columna '{column}'")
+            continue
+
+        for row, value in enumerate(df[column].to_list()):
+            key = normalize(value)
+            if key:
+                locations.append((kind, key, snapshot, row))
+
+    # Si el snapshot ya estaba indexado (archivo sobrescrito) solo se tocan sus filas
+    conn.execute("DELETE FROM locations WHERE snapshot = ?", (snapshot,))
+    conn.executemany(
+        "INSERT INTO locations (kind, key, snapshot, row) VALUES (?, ?, ?, ?)",
+        locations
+    )
+    conn.execute(
+        """
+        INSERT OR REPLACE INTO snapshots (path, snapshot_date, indexed_at, rows, size, mtime_ns)
+        VALUES (?, ?, ?, ?, ?, ?)
+        """,
+        (
+            snapshot,
+            snapshot_date.isoformat(timespec="seconds"),
+            datetime.now().isoformat(timespec="seconds"),
+            df.height,
+            stat.st_size,
+            stat.st_mtime_ns
+        )
+    )
+
+    logger.info(f"Snapshot indexado: {parquet_file} ({df.height} filas)")
+
+
+def update_person_index(parquet_file: str, df: pl.DataFrame = None,
+                        snapshot_date: datetime = None):
+    """
+    Agrega (o reemplaza) un snapshot en el índice de personas
+
+    Registra, por cédula y por posición normalizadas, las filas en las que
+    aparece cada persona dentro del archivo Parquet del snapshot.
+
+    Args:
+        parquet_file: Ruta al archivo Parquet del snapshot
+        df: DataFrame ya guardado en parquet_file (si no se pasa, se lee del archivo)
+        snapshot_date: Fecha del scraping (si no se pasa, se deduce del archivo)
+    """
+    with closing(_connect()) as conn, conn:
+        _index_snapshot(conn, parquet_file, df, snapshot_date)
+
+
+def rebuild_person_index(paths: list):
+    """
+    Reconstruye el índice desde cero a partir de snapshots Parquet existentes
+
+    Sirve para indexar snapshots guardados antes de existir el índice o para
+    recuperar un índice corrupto. El índice nuevo se construye en un archivo
+    temporal y solo reemplaza al actual si todos los snapshots se indexaron.
+    La fecha de cada snapshot se toma del sufijo _YYYYMMDD o de su mtime.
+
+    Args:
+        paths: Rutas a los archivos Parquet de los snapshots
+    """
+    paths = list(paths)
+    if not paths:
+        raise ValueError("No se indicaron snapshots para reconstruir el índice")
+
+    tmp_file = f"{INDEX_FILE}.rebuild"
+    for suffix in ("", "-journal"):
+        if os.path.exists(tmp_file + suffix):
+            os.remove(tmp_file + suffix)
+
+    try:
+        with closing(_connect(tmp_file)) as conn, conn:
+            for path in paths:
+                _index_snapshot(conn, path)
+    except Exception:
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+        raise
+
+    # Un journal del índice anterior no debe aplicarse sobre el nuevo
+    for suffix in ("-journal", "-wal", "-shm"):
+        if os.path.exists(INDEX_FILE + suffix):
+            os.remove(INDEX_FILE + suffix)
+    os.replace(tmp_file, INDEX_FILE)
+
+    logger.info(f"Índice de personas reconstruido con {len(paths)} snapshots")
+
+
+def _row_ranges(rows: list) -> list:
+    """Agrupa números de fila en rangos contiguos (offset, largo)"""
+    ranges = []
+    for row in sorted(rows):
+        if ranges and ranges[-1][0] + ranges[-1][1] == row:
+            ranges[-1][1] += 1
+        else:
+            ranges.append([row, 1])
+
+    return ranges
+
+
+def get_person_timeline(cedula: str = None, posicion=None) -> pl.DataFrame:
+    """
+    Obtiene el historial de una persona en todos los snapshots indexados
+
+    Hace una sola lectura por snapshot: las filas registradas en el índice se
+    leen con slice, así el lector de Parquet salta los row groups que no las
+    contienen. Si un snapshot cambió en disco desde que se indexó, se vuelve a
+    indexar antes de leerlo, y las filas leídas se filtran por la llave para
+    no devolver nunca datos de otra persona.
+
+    Args:
+        cedula: Cédula de la persona
+        posicion: Identificacion / Posicion (se usa si no se pasa cédula)
+
+    Returns:
+        DataFrame de Polars ordenado por fecha de snapshot, con las columnas
+        'snapshot' y 'snapshot_fecha' además de las de la planilla
+    """
+    if cedula is not None:
+        kind, key, column, normalize = "cedula", normalize_cedula(cedula), CEDULA_COLUMN, normalize_cedula
+    elif posicion is not None:
+        kind, key, column, normalize = "posicion", normalize_posicion(posicion), POSICION_COLUMN, normalize_posicion
+    else:
+        raise ValueError("Se requiere una cédula o una posición")
+
+    with closing(_connect()) as conn:
+        # Snapshots que cambiaron en disco sin actualizar el índice
+        for snapshot, size, mtime_ns in conn.execute(
+            "SELECT path, size, mtime_ns FROM snapshots"
+        ).fetchall():
+            if not os.path.exists(snapshot):
+                continue
+
+            stat = os.stat(snapshot)
+            if (stat.st_size, stat.st_mtime_ns) != (size, mtime_ns):
+                logger.warning(f"Snapshot modificado desde que se indexó, reindexando: {snapshot}")
+                try:
+                    with conn:
+                        _index_snapshot(conn, snapshot)
+                except Exception as e:
+                    logger.error(f"No se pudo reindexar {snapshot}: {e}")
+
+        result = conn.execute(
+            """
+            SELECT l.snapshot, s.snapshot_date, l.row
+            FROM locations l JOIN snapshots s ON s.path = l.snapshot
+            WHERE l.kind = ? AND l.key = ?
+            """,
+            (kind, key)
+        ).fetchall()
+
+    locations = {}
+    for snapshot, snapshot_date, row in result:
+        locations.setdefault((snapshot, snapshot_date), []).append(row)
+
+    frames = []
+    for (snapshot, snapshot_date), rows in locations.items():
+        if not os.path.exists(snapshot):
+            logger.warning(f"Snapshot indexado no encontrado: {snapshot}")
+            continue
+
+        lf = pl.scan_parquet(snapshot)
+        frame = pl.concat(
+            [lf.slice(offset, length) for offset, length in _row_ranges(rows)]
+        ).collect()
+
+        # Descartar filas que ya no pertenecen a la persona (índice desactualizado)
+        frame = frame.filter(
+            pl.col(column).cast(pl.String)
+            .map_elements(normalize, return_dtype=pl.String) == key
+        )
+        if frame.height < len(rows):
+            logger.warning(f"Índice desactualizado para {snapshot}: {len(rows) - frame.height} filas descartadas")
+
+        frames.append(frame.with_columns(
+            pl.lit(os.path.basename(snapshot)).alias("snapshot"),
+            pl.lit(snapshot_date).alias("snapshot_fecha")
+        ))
+
+    if not frames:
+        return pl.DataFrame()
+
+    return pl.concat(frames, how="diagonal_relaxed").sort("snapshot_fecha")
+
+
+# ------------------------------------ EJEMPLO DE USO ------------------
+
+if __name__ == "__main__":
+    # Backfill: python -m app.services.person_index snapshots/*.parquet
+    logging.basicConfig(level=logging.INFO)
+
+    if len(sys.argv) < 2:
+        print("Uso: python -m app.services.person_index <snapshot.parquet> [...]")
+        sys.exit(1)
+
+    rebuild_person_index(sys.argv[1:])
@@ -11,36 +11,116 @@ from webdriver_manager.chrome import ChromeDriverManager
 from selenium.webdriver.chrome.service import Service
 import time
 import logging
+from datetime import datetime
+from app.services.person_index import update_person_index
 
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# ------------------------------------ FUNCIONES ------------------
+# ------------------------------------ NAVEGADOR ------------------
+
+# Perfil ligero de Chrome compartido por todas las extracciones
+BROWSER_CONFIG = {
+    'headless': True,
+    'window_size': (1280, 800),
+    'page_load_strategy': 'eager',  # No esperar imágenes, hojas de estilo ni fuentes
+    'block_resources': True,
+    # Recursos que no se necesitan para leer la tabla (íconos forward_bot, fuentes)
+    'blocked_urls': [
+        "*.png", "*.jpg", "*.jpeg", "*.gif", "*.svg", "*.ico", "*.webp",
+        "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot"
+    ],
+    # Las hojas de estilo se bloquean solo si se pide: .text depende de la
+    # visibilidad y ScriptCase puede ocultar campos por clase CSS
+    'block_stylesheets': False
+}
+
 
-def extract_from_local_html(file_path: str) -> pl.DataFrame:
+def build_chrome_options(config: dict) -> Options:
     """
-    Extrae datos de un archivo HTML local que contiene una tabla de empleados
+    Construye las opciones de Chrome a partir del perfil del navegador
     
     Args:
-        file_path: Ruta al archivo HTML local
+        config: Perfil completo del navegador (BROWSER_CONFIG ya combinado)
     
     Returns:
-        DataFrame de Polars con los datos extraídos
+        Opciones de Chrome
     """
-    # Configurar opciones de Chrome
     chrome_options = Options()
-    chrome_options.add_argument("--headless")  # Ejecutar sin interfaz gráfica
+    if config['headless']:
+        chrome_options.add_argument("--headless")  # Ejecutar sin interfaz gráfica
     chrome_options.add_argument("--no-sandbox")
     chrome_options.add_argument("--disable-dev-shm-usage")
     chrome_options.add_argument("--disable-gpu")
-    chrome_options.add_argument("--window-size=1920,1080")
+    chrome_options.add_argument("--window-size={},{}".format(*config['window_size']))
+    
+    # Desactivar extensiones y servicios en segundo plano
+    chrome_options.add_argument("--disable-extensions")
+    chrome_options.add_argument("--disable-background-networking")
+    chrome_options.add_argument("--disable-component-update")
+    chrome_options.add_argument("--disable-default-apps")
+    chrome_options.add_argument("--disable-sync")
+    chrome_options.add_argument("--no-first-run")
+    chrome_options.add_argument("--mute-audio")
+    
+    if config['block_resources']:
+        chrome_options.add_argument("--blink-settings=imagesEnabled=false")
+        chrome_options.add_experimental_option("prefs", {
+            "profile.managed_default_content_settings.images": 2
+        })
+    
+    chrome_options.page_load_strategy = config['page_load_strategy']
+    
+    return chrome_options
+
+
+def create_driver(browser_config: dict = None) -> webdriver.Chrome:
+    """
+    Inicializa Chrome con el perfil ligero y bloquea los recursos no esenciales
+    
+    Args:
+        browser_config: Valores que sobrescriben BROWSER_CONFIG (opcional)
+    
+    Returns:
+        WebDriver de Chrome
+    """
+    config = {**BROWSER_CONFIG, **(browser_config or {})}
     
+    service = Service(ChromeDriverManager().install())
+    driver = webdriver.Chrome(service=service, options=build_chrome_options(config))
+    
+    blocked_urls = list(config['blocked_urls'])
+    if config['block_stylesheets']:
+        blocked_urls.append("*.css")
+    
+    if config['block_resources'] and blocked_urls:
+        try:
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": blocked_urls})
+        except Exception as e:
+            logger.warning(f"No se pudieron bloquear recursos vía CDP: {e}")
+    
+    return driver
+
+
+# ------------------------------------ FUNCIONES ------------------
+
+def extract_from_local_html(file_path: str, browser_config: dict = None) -> pl.DataFrame:
+    """
+    Extrae datos de un archivo HTML local que contiene una tabla de empleados
+    
+    Args:
+        file_path: Ruta al archivo HTML local
+        browser_config: Configuración del navegador (ver BROWSER_CONFIG, opcional)
+    
+    Returns:
+        DataFrame de Polars con los datos extraídos
+    """
     driver = None
     try:
-        # Inicializar driver
-        service = Service(ChromeDriverManager().install())
-        driver = webdriver.Chrome(service=service, options=chrome_options)
+        # Inicializar driver con el perfil ligero compartido
+        driver = create_driver(browser_config)
         
         # Convertir ruta a URL de archivo
         file_url = f"file:///{file_path.replace('\\', '/')}"
@@ -120,7 +200,8 @@ def extract_from_local_html(file_path: str) -> pl.DataFrame:
             driver.quit()
 
 
-def extract_all_pages(url: str, records_per_page: int = 50, max_pages: int = 10) -> pl.DataFrame:
+def extract_all_pages(url: str, records_per_page: int = 50, max_pages: int = 10,
+                      browser_config: dict = None) -> pl.DataFrame:
     """
     Extrae datos de múltiples páginas de la tabla de empleados
     
@@ -128,25 +209,17 @@ def extract_all_pages(url: str, records_per_page: int = 50, max_pages: int = 10)
         url: URL del sitio web
         records_per_page: Número de registros por página (10, 20, 50)
         max_pages: Número máximo de páginas a extraer
+        browser_config: Configuración del navegador (ver BROWSER_CONFIG, opcional)
     
     Returns:
         DataFrame de Polars con todos los datos extraídos
     """
-    # Configurar opciones de Chrome
-    chrome_options = Options()
-    chrome_options.add_argument("--headless")  # Ejecutar sin interfaz gráfica
-    chrome_options.add_argument("--no-sandbox")
-    chrome_options.add_argument("--disable-dev-shm-usage")
-    chrome_options.add_argument("--disable-gpu")
-    chrome_options.add_argument("--window-size=1920,1080")
-    
     driver = None
     all_data = []
     
     try:
-        # Inicializar driver
-        service = Service(ChromeDriverManager().install())
-        driver = webdriver.Chrome(service=service, options=chrome_options)
+        # Inicializar driver con el perfil ligero compartido
+        driver = create_driver(browser_config)
         
         logger.info(f"Navegando a: {url}")
         driver.get(url)
@@ -289,8 +362,9 @@ def navigate_to_next_page(driver, current_page: int) -> bool:
         next_page_links = driver.find_elements(By.CSS_SELECTOR, f"a.scGridToolbarNav[href*='nm_gp_submit_rec({current_page * 10 + 1})']")
         
         if next_page_links:
-            # Hacer clic en el enlace de la siguiente página
-            next_page_links[0].click()
+            # Hacer clic en el enlace de la siguiente página (vía JS, no depende de
+            # que el enlace sea visible con imágenes o estilos bloqueados)
+            driver.execute_script("arguments[0].click()", next_page_links[0])
             time.sleep(3)
             
             # Esperar a que la página se cargue
@@ -303,7 +377,8 @@ def navigate_to_next_page(driver, current_page: int) -> bool:
             # Intentar usar el botón "forward"
             forward_button = driver.find_element(By.ID, "forward_bot")
             if forward_button and "disabled" not in forward_button.find_element(By.TAG_NAME, "img").get_attribute("src"):
-                forward_button.click()
+                # El enlace solo contiene la imagen de la flecha, que no se carga
+                driver.execute_script("arguments[0].click()", forward_button)
                 time.sleep(3)
                 
                 WebDriverWait(driver, 10).until(
@@ -353,30 +428,22 @@ def clean_and_convert_data(df: pl.DataFrame) -> pl.DataFrame:
         return df
 
 
-def extract(url: str, headers: dict = None) -> pl.DataFrame:
+def extract(url: str, headers: dict = None, browser_config: dict = None) -> pl.DataFrame:
     """
     Extrae datos de una tabla HTML de empleados desde una URL
     
     Args:
         url: URL del sitio web
         headers: Diccionario con los nombres de las columnas y sus tipos (opcional)
+        browser_config: Configuración del navegador (ver BROWSER_CONFIG, opcional)
     
     Returns:
         DataFrame de Polars con los datos extraídos
     """
-    # Configurar opciones de Chrome
-    chrome_options = Options()
-    chrome_options.add_argument("--headless")  # Ejecutar sin interfaz gráfica
-    chrome_options.add_argument("--no-sandbox")
-    chrome_options.add_argument("--disable-dev-shm-usage")
-    chrome_options.add_argument("--disable-gpu")
-    chrome_options.add_argument("--window-size=1920,1080")
-    
     driver = None
     try:
-        # Inicializar driver
-        service = Service(ChromeDriverManager().install())
-        driver = webdriver.Chrome(service=service, options=chrome_options)
+        # Inicializar driver con el perfil ligero compartido
+        driver = create_driver(browser_config)
         
         logger.info(f"Navegando a: {url}")
         driver.get(url)
@@ -534,13 +601,14 @@ headers = {
 }
 
 
-def save_data(df: pl.DataFrame, base_filename: str = "employees_data"):
+def save_data(df: pl.DataFrame, base_filename: str = "employees_data", scraped_at: datetime = None):
     """
     Guarda el DataFrame en múltiples formatos
     
     Args:
         df: DataFrame de Polars
         base_filename: Nombre base para los archivos
+        scraped_at: Fecha y hora del scraping (por defecto, ahora)
     """
     if df.is_empty():
         logger.warning("No hay datos para guardar")
@@ -555,9 +623,13 @@ def save_data(df: pl.DataFrame, base_filename: str = "employees_data"):
         
         # Guardar en Parquet para mejor rendimiento
         parquet_file = f"{base_filename}.parquet"
-        df.write_parquet(parquet_file)
+        # Row groups pequeños para que el índice de personas lea solo lo necesario
+        df.write_parquet(parquet_file, row_group_size=10000)
         logger.info(f"Datos guardados en Parquet: {parquet_file}")
         
+        # Actualizar el índice de personas con el nuevo snapshot
+        update_person_index(parquet_file, df, scraped_at or datetime.now())
+        
     except Exception as e:
         logger.error(f"Error al guardar datos: {e}")
 
@@ -572,7 +644,8 @@ def scrape_with_config(url: str, config: dict = None) -> pl.DataFrame:
             'records_per_page': 50,
             'max_pages': 10,
             'headless': True,
-            'wait_time': 3
+            'wait_time': 3,
+            'browser': {...}  # Valores que sobrescriben BROWSER_CONFIG
         }
     
     Returns:
@@ -595,7 +668,8 @@ def scrape_with_config(url: str, config: dict = None) -> pl.DataFrame:
     return extract_all_pages(
         url=url,
         records_per_page=default_config['records_per_page'],
-        max_pages=default_config['max_pages']
+        max_pages=default_config['max_pages'],
+        browser_config={'headless': default_config['headless'], **default_config.get('browser', {})}
     )
 
 
@@ -644,6 +718,7 @@ if __name__ == "__main__":
     
     #Extraer de múltiples páginas con 50 registros por página
     logger.info("=== EXTRAYENDO DATOS DESDE URL - MÚLTIPLES PÁGINAS ===")
+    scraped_at = datetime.now()
     all_employees_data = extract_all_pages(
         url=url, 
         records_per_page=10,  # Cambiar a 50 registros por página
@@ -653,7 +728,8 @@ if __name__ == "__main__":
     if not all_employees_data.is_empty():
         logger.info(f"Extracción exitosa desde URL - múltiples páginas")
         print_data_summary(all_employees_data)
-        save_data(all_employees_data, "employees_data_all_pages")
+        # Un snapshot por día para conservar el historial de la planilla
+        save_data(all_employees_data, f"employees_data_all_pages_{scraped_at:%Y%m%d}", scraped_at)
     else:
         logger.error("No se pudieron extraer datos de la URL")
     